@@ -22,7 +22,7 @@ how_many_anime_in_one_request = 50 #max 50
 total_updated = 0
 total_added = 0
 url = 'https://graphql.anilist.co'
-date_format ='%Y-%m-%d %H:%M:?'
+date_format ='%Y-%m-%d %H:%M:%S'
 
 id_or_name = input(f"Do you want to use, {GREEN}user id{RESET} or {GREEN}name?{RESET} (exit for exit :o)\n 1: id \n 2: name \n {CYAN}choice: {RESET}")
 if id_or_name == "exit":
@@ -398,29 +398,10 @@ try: # open connection to database
                 # Convert the datetime object to a string in the correct format
                 entry_createdAt_parsed = entry_createdAt_datetime.strftime(date_format)
                 
-                # rekor[18] is last_updated_on_site
+                # rekor[18] is last_updated_on_site, written with the same format as updatedAt_parsed,
+                # so the strings compare directly without parsing either side back to a timestamp
                 if record:
-                    if record[18] is not None:
-                        # Check if record[18] is a string and convert it to datetime object
-                        if isinstance(record[18], str):
-                            try:
-                                db_datetime = datetime.strptime(record[18], date_format)
-                                db_timestamp = int(time.mktime(db_datetime.timetuple()))
-                            except ValueError:
-                                # Handle the exception if the date format is incorrect
-                                print("Date format is incorrect")
-                                db_timestamp = None
-                        else:
-                            # If record[18] is already a datetime object
-                            db_timestamp = int(time.mktime(record[18].timetuple()))
-                    else:
-                        db_timestamp = None
-
-                    if db_timestamp is not None and updatedAt_parsed is not None:
-                        updatedAt_timestamp = int(time.mktime(time.strptime(updatedAt_parsed, date_format)))
-                    else:
-                        updatedAt_timestamp = None
-
+                    if record[18] != updatedAt_parsed:
                         update_query = """
                         UPDATE `manga_list` SET  
                             id_anilist = ?,
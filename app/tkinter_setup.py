@@ -4,8 +4,8 @@ from subprocess import Popen, PIPE
 import threading
 from take_full_manga_list_sqllite import start_backup
 import re
-import os
 import sqlite3
+from contextlib import closing
 
 DARK_BG = "#2D2D2D"
 DARK_TEXT = "#EAEAEA"
@@ -22,28 +22,33 @@ color_map = {
     "\033[37m": 'white',
     "\033[0m": 'white',  # Reset to default
 }
-database_path = 'app/anilist_db.db'
 
-def check_database_exists():
-    return os.path.exists(database_path)
+# Splits a log line into text and ANSI color-code parts, compiled once
+_ANSI_RE = re.compile(r'(\x1b\[\d+m)')
+database_path = 'app/anilist_db.db'
 
-def validate_database_structure():
+def check_db():
+    """Return (exists, valid) for the database from a single read-only open"""
     try:
-        with sqlite3.connect(database_path) as conn:
-            cursor = conn.cursor()
-            # Example: Check for a specific table
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='your_table_name';")
-            return bool(cursor.fetchone())
-    except sqlite3.Error as e:
-        print(f"Database validation error: {e}")
-        return False
+        # mode=ro never creates the file and fails right away if it is missing
+        conn = sqlite3.connect(f"file:{database_path}?mode=ro", uri=True)
+    except sqlite3.OperationalError:
+        return False, False
+    with closing(conn):
+        try:
+            # Example: Check for a specific table, table_info has no rows if it is missing
+            return True, bool(conn.execute("PRAGMA table_info('your_table_name')").fetchone())
+        except sqlite3.Error as e:
+            print(f"Database validation error: {e}")
+            return True, False
 
 
 
 class App:
     def __init__(self, root):
         # Initialization and setup...
-        if not check_database_exists() or not validate_database_structure():
+        db_exists, db_valid = check_db()
+        if not db_exists or not db_valid:
             self.setup_database_ui()
         else:
             self.setup_flask_config_ui()
@@ -61,6 +66,8 @@ class App:
         self.output = scrolledtext.ScrolledText(self.root, bg=DARK_BG, fg=DARK_TEXT)
         self.output.pack(expand=True, fill='both', side='right')
         self.output.configure(font='Consolas 10')  # Set a more terminal-like font
+        # Color tags already configured on the output widget
+        self._configured_tags = set()
 
         self.choice_var = tk.StringVar(value="1")  # Default to "1" for ID
         self.input_var = tk.StringVar()
@@ -102,23 +109,32 @@ class App:
 
     def print_to_terminal(self, message):
         def cmd():
-            self.output.configure(state='normal')
+            output = self.output
+            configured_tags = self._configured_tags
+            get_color = color_map.get
             tag_name = None  # Initialize tag_name to None
+            segments = []  # Flat text, tags, text, tags... list for a single insert call
 
-            # Split message by ANSI codes and process each part
-            for part in re.split('(\033\[\d+m)', message):
-                color_code = color_map.get(part, None)
+            # Split message by ANSI codes, merging neighbouring parts with the same color
+            for part in _ANSI_RE.split(message):
+                color_code = get_color(part)
                 if color_code:  # If part is a color code, update tag_name
                     tag_name = color_code
-                    self.output.tag_configure(tag_name, foreground=color_code)
-                elif tag_name:  # If part is text and tag_name is set, insert with color
-                    self.output.insert(tk.END, part, tag_name)
-                else:  # If part is text but no color tag is set, insert without color
-                    self.output.insert(tk.END, part)
-                    
-            self.output.insert(tk.END, "\n")  # Ensure newline at the end
-            self.output.configure(state='disabled')
-            self.output.see(tk.END)
+                    if tag_name not in configured_tags:  # tag_configure only once per color
+                        output.tag_configure(tag_name, foreground=color_code)
+                        configured_tags.add(tag_name)
+                elif part:
+                    tags = tag_name or ()
+                    if segments and segments[-1] == tags:
+                        segments[-2] += part
+                    else:
+                        segments += [part, tags]
+            segments += ["\n", ()]  # Ensure newline at the end
+
+            output.configure(state='normal')
+            output.insert(tk.END, *segments)
+            output.configure(state='disabled')
+            output.see(tk.END)
         self.root.after(0, cmd)
 
 
@@ -2,13 +2,19 @@ import tkinter as tk
 from tkinter import scrolledtext
 import subprocess
 import threading
+import queue
 import os
+import sys
 import re
+import json
+import itertools
+import functools
 import sqlite3
+from contextlib import closing
 import winreg
 from installer_gui_elements import PythonInstallerApp
+import install_requirements
 from take_full_manga_list_sqllite_tkinter import start_backup
-import concurrent.futures
 
 DARK_BG = "#2D2D2D"
 DARK_TEXT = "#EAEAEA"
@@ -16,6 +22,10 @@ DARK_SIDEBAR = "#404040"
 DARK_BUTTON_BG = "#5C5C5C"
 DARK_BUTTON_FG = "#EAEAEA"
 
+# How often (ms) the UI thread drains queued log lines, and how many per pass
+LOG_POLL_INTERVAL_MS = 50
+LOG_BATCH_SIZE = 200
+
 color_map = {
     "\033[31m": 'red',
     "\033[32m": 'green',
@@ -27,96 +37,215 @@ color_map = {
     "\033[0m": 'white',  # Reset to default
 }
 
-database_path = 'app/anilist_db.db'
+# Splits a log line into text and ANSI color-code parts, compiled once
+_ANSI_RE = re.compile(r'(\x1b\[\d+m)')
 
-def check_database_exists():
-    return os.path.exists(database_path)
+database_path = 'app/anilist_db.db'
 
-def validate_database_structure():
+# Python installs found on a previous run, reused while the registry and the executables are unchanged
+python_scan_cache_path = os.path.expanduser("~/.eastern_tales_installer_cache.json")
+python_core_key_path = r"SOFTWARE\Python\PythonCore"
+# System-wide installs register under HKLM, per-user installs under HKCU. Each hive is read
+# through both the 64-bit and 32-bit views, so installs of the other bitness aren't missed.
+python_registry_locations = [
+    (hive, winreg.KEY_READ | view)
+    for hive in (winreg.HKEY_LOCAL_MACHINE, winreg.HKEY_CURRENT_USER)
+    for view in (winreg.KEY_WOW64_64KEY, winreg.KEY_WOW64_32KEY)
+]
+# Per-user installs live in ~\AppData\Local\Programs\Python\PythonXY
+user_python_installs_dir = os.path.expanduser(r"~\AppData\Local\Programs\Python")
+_USER_PYTHON_DIR_RE = re.compile(r"Python3(\d+)")
+# Version from an install path, e.g. ...\Python310\python.exe or ...\Python3.12\python.exe
+_PYVER_RE = re.compile(r"Python(\d)\.?(\d{1,2})")
+# Version from `python -V` output, e.g. "Python 3.11.4"
+_PYVER_OUTPUT_RE = re.compile(r"Python (\d+)\.(\d+)")
+
+def check_db():
+    """Return (exists, valid) for the database from a single read-only open"""
     try:
-        with sqlite3.connect(database_path) as conn:
-            cursor = conn.cursor()
-            # Example: Check for a specific table
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='your_table_name';")
-            return bool(cursor.fetchone())
-    except sqlite3.Error as e:
-        print(f"Database validation error: {e}")
-        return False
+        # mode=ro never creates the file and fails right away if it is missing
+        conn = sqlite3.connect(f"file:{database_path}?mode=ro", uri=True)
+    except sqlite3.OperationalError:
+        return False, False
+    with closing(conn):
+        try:
+            # Example: Check for a specific table, table_info has no rows if it is missing
+            return True, bool(conn.execute("PRAGMA table_info('your_table_name')").fetchone())
+        except sqlite3.Error as e:
+            print(f"Database validation error: {e}")
+            return True, False
+
+@functools.lru_cache(maxsize=None)
+def query_python_version(python_path, mtime):
+    """Ask the interpreter for its version, memoized per (path, mtime)"""
+    try:
+        result = subprocess.run(
+            [python_path, "-V"], capture_output=True, text=True, timeout=2,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    # Old interpreters print the version to stderr
+    match = _PYVER_OUTPUT_RE.match(result.stdout or result.stderr)
+    return f"Python {match.group(1)}.{match.group(2)}" if match else None
 
 class PythonInstaller:
     def __init__(self, root):
+        self.root = root
         # Initialize GUI using the class from installer_gui.py
         self.gui = PythonInstallerApp(root, self.run_installation)
+
+        # Worker threads put log lines here; only the UI thread touches the widgets
+        self._log_queue = queue.Queue()
          
         # Store Python paths
         self.python_paths = {}
         self.selected_python_path = None
 
+        # Color tags already configured on the output widget
+        self._configured_tags = set()
+
         # Scan for Python versions on startup
         self.scan_for_python_versions()
 
+        self.root.after(LOG_POLL_INTERVAL_MS, self._drain_log_queue)
+
        
 
 
 
     def scan_for_python_versions(self):
-        found_python_paths = []
+        registry_fingerprint = self.get_registry_fingerprint()
+        cached_python_paths = self.load_cached_python_paths(registry_fingerprint)
 
-        # Check common locations
-        self.check_common_python_locations(found_python_paths)
-        # Check Windows registry
-        self.check_python_in_registry(found_python_paths)
+        if cached_python_paths is not None:
+            self.python_paths = cached_python_paths
+        else:
+            # Common locations first, then the Windows registry, both probed lazily
+            found_python_paths = itertools.chain(self.check_common_python_locations(), self.check_python_in_registry())
 
-        # Determine the Python version to use
-        if found_python_paths:
             for python_path in found_python_paths:
                 python_version = self.extract_python_version(python_path)
                 if python_version:
                     self.python_paths[python_version] = python_path
+                    if python_version == "Python 3.10":
+                        break  # Preferred version, nothing left to look for
 
+            if self.python_paths:  # Don't cache a miss, the user may install Python next
+                self.save_cached_python_paths(registry_fingerprint)
+
+        # Determine the Python version to use
+        if self.python_paths:
             if "Python 3.10" in self.python_paths:
                 self.selected_python_path = self.python_paths["Python 3.10"]
             elif "Python 3.11" in self.python_paths:
                 self.selected_python_path = self.python_paths["Python 3.11"]
             else:
-                self.update_output("Python 3.10 or higher is required. Please install Python 3.10 or 3.11 to proceed.")
-                return
+                # Fall back to the newest 3.12+ install, if there is one
+                newer_versions = [version for version in self.python_paths if self.version_tuple(version) >= (3, 12)]
+                if not newer_versions:
+                    self.update_output("Python 3.10 or higher is required. Please install Python 3.10 or higher to proceed.")
+                    return
+                self.selected_python_path = self.python_paths[max(newer_versions, key=self.version_tuple)]
 
             self.gui.install_button.configure(state="normal")
         else:
             self.gui.install_button.configure(state="disabled")
 
-    def check_common_python_locations(self, found_python_paths):
-        common_paths = [
-            r"C:\Python310\python.exe",
-            r"C:\Python311\python.exe",
-            os.path.expanduser(r"~\AppData\Local\Programs\Python\Python310\python.exe"),
-            os.path.expanduser(r"~\AppData\Local\Programs\Python\Python311\python.exe")
-        ]
-        for path in common_paths:
-            if os.path.exists(path):
-                found_python_paths.append(path)
-
-    def check_python_in_registry(self, found_python_paths):
-        python_key_path = r"SOFTWARE\Python\PythonCore"
+    def get_registry_fingerprint(self):
+        """Cheap summary of the registry state: number of PythonCore version subkeys per hive and view"""
+        fingerprint = []
+        for hive, access in python_registry_locations:
+            try:
+                with winreg.OpenKey(hive, python_core_key_path, 0, access) as python_key:
+                    fingerprint.append(winreg.QueryInfoKey(python_key)[0])
+            except OSError:
+                fingerprint.append(None)
+        return fingerprint
+
+    def load_cached_python_paths(self, registry_fingerprint):
+        """Return the cached {version: path} map, or None if it is missing or stale"""
         try:
-            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, python_key_path) as python_key:
-                for i in range(winreg.QueryInfoKey(python_key)[0]):
-                    version_key = winreg.EnumKey(python_key, i)
-                    with winreg.OpenKey(python_key, version_key) as subkey:
-                        install_path = winreg.QueryValue(subkey, "InstallPath")
-                        python_exe = os.path.join(install_path, "python.exe")
-                        if os.path.exists(python_exe):
-                            found_python_paths.append(python_exe)
+            with open(python_scan_cache_path, encoding="utf-8") as cache_file:
+                cache = json.load(cache_file)
+            if cache["registry_fingerprint"] != registry_fingerprint:
+                return None
+            for python_path, mtime in cache["mtimes"].items():
+                if os.path.getmtime(python_path) != mtime:
+                    return None
+            return cache["python_paths"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save_cached_python_paths(self, registry_fingerprint):
+        try:
+            cache = {
+                "registry_fingerprint": registry_fingerprint,
+                "python_paths": self.python_paths,
+                "mtimes": {path: os.path.getmtime(path) for path in self.python_paths.values()},
+            }
+            with open(python_scan_cache_path, "w", encoding="utf-8") as cache_file:
+                json.dump(cache, cache_file)
+        except OSError as e:
+            print(f"Could not write Python scan cache: {e}")
+
+    def check_common_python_locations(self):
+        """Yield python.exe paths from the usual install folders, 3.10 first"""
+        for path in (r"C:\Python310\python.exe", r"C:\Python311\python.exe"):
+            if os.path.isfile(path):
+                yield path
+
+        # One directory read finds every per-user install, whatever its version
+        try:
+            with os.scandir(user_python_installs_dir) as entries:
+                install_dirs = [entry.path for entry in entries if _USER_PYTHON_DIR_RE.fullmatch(entry.name)]
         except OSError:
-            pass
+            install_dirs = []
+        for install_dir in sorted(install_dirs):  # Python310 sorts before Python311, Python312...
+            python_exe = os.path.join(install_dir, "python.exe")
+            if os.path.isfile(python_exe):
+                yield python_exe
+
+    def check_python_in_registry(self):
+        """Yield python.exe paths registered under PythonCore"""
+        seen_paths = set()
+        for hive, access in python_registry_locations:
+            try:
+                with winreg.OpenKey(hive, python_core_key_path, 0, access) as python_key:
+                    for i in range(winreg.QueryInfoKey(python_key)[0]):
+                        version_key = winreg.EnumKey(python_key, i)
+                        try:
+                            with winreg.OpenKey(python_key, version_key + r"\InstallPath", 0, access) as install_key:
+                                install_path, value_type = winreg.QueryValueEx(install_key, "")
+                        except OSError:
+                            continue
+                        if value_type != winreg.REG_SZ:
+                            continue
+                        python_exe = os.path.join(install_path, "python.exe")
+                        # Unredirected keys show up in both views, only add them once
+                        if python_exe not in seen_paths and os.path.exists(python_exe):
+                            seen_paths.add(python_exe)
+                            yield python_exe
+            except OSError:
+                pass
 
     def extract_python_version(self, python_path):
-        match = re.search(r"Python(\d)(\d{2})", python_path)
-        if match:
-            major, minor = match.groups()
-            return f"Python {major}.{minor}"
-        return None
+        # Works for Store, conda and pyenv-win installs whose folders aren't named PythonXY
+        try:
+            python_version = query_python_version(python_path, os.path.getmtime(python_path))
+        except OSError:
+            python_version = None
+        if python_version:
+            return python_version
+
+        # Fall back to the folder name if the interpreter could not be run
+        match = _PYVER_RE.search(python_path)
+        return f"Python {match.group(1)}.{int(match.group(2))}" if match else None
+
+    def version_tuple(self, python_version):
+        """'Python 3.12' -> (3, 12)"""
+        major, minor = python_version.split()[1].split(".")
+        return int(major), int(minor)
     
 
     
@@ -126,45 +255,85 @@ class PythonInstaller:
 
     def run_requirements_installation_process(self):
         try:
-            command = [self.selected_python_path, "install_requirements.py"]
+            if os.path.normcase(os.path.abspath(self.selected_python_path)) == os.path.normcase(sys.executable):
+                # Same interpreter as ours: create the venv here instead of launching install_requirements.py
+                install_requirements.create_virtualenv(self._log_queue.put)
+                self._log_queue.put("Step 2: Installing dependencies...")
+                command = install_requirements.pip_install_command()
+            else:
+                command = [self.selected_python_path, "install_requirements.py"]
             process = subprocess.Popen(
                 command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
             )
 
-            for stdout_line in iter(process.stdout.readline, ""):
-                self.update_output(stdout_line)
-
-            for stderr_line in iter(process.stderr.readline, ""):
-                self.update_output(f"ERROR: {stderr_line}")
-
-            process.stdout.close()
-            process.stderr.close()
+            self._drain_process_output(process)
             process.wait()
-            self.update_output("Installation Complete!\n")
+            self._log_queue.put("Installation Complete!\n")
         except Exception as e:
-            self.update_output(f"Error: {str(e)}\n")
+            self._log_queue.put(f"Error: {str(e)}\n")
 
     
 
     
+    def _pump_pipe(self, pipe, prefix=""):
+        """Push every line of a subprocess pipe onto the log queue until EOF"""
+        for line in pipe:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8', errors='replace').strip()
+            self._log_queue.put(f"{prefix}{line}")
+        pipe.close()
+
+    def _drain_process_output(self, process):
+        """Read stdout and stderr at the same time, so a full stderr pipe can't stall the child.
+        select() only works on sockets on Windows, hence a second thread for stderr."""
+        stderr_thread = threading.Thread(target=self._pump_pipe, args=(process.stderr, "ERROR: "), daemon=True)
+        stderr_thread.start()
+        self._pump_pipe(process.stdout)
+        stderr_thread.join()
+
+    def _write_pending_logs(self, limit=None):
+        """Write queued log lines to the output widget, at most `limit` of them"""
+        written = 0
+        while limit is None or written < limit:
+            try:
+                message = self._log_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.update_output(message)
+            written += 1
+
+    def _drain_log_queue(self):
+        """Periodic UI-thread poller for the log queue"""
+        self._write_pending_logs(LOG_BATCH_SIZE)
+        self.root.after(LOG_POLL_INTERVAL_MS, self._drain_log_queue)
+
     def update_output(self, message):
-        self.gui.output_text.configure(state='normal')
+        output_text = self.gui.output_text
+        configured_tags = self._configured_tags
+        get_color = color_map.get
         tag_name = None  # Initialize tag_name to None
+        segments = []  # Flat text, tags, text, tags... list for a single insert call
 
-        # Split message by ANSI codes and process each part
-        for part in re.split('(\033\[\d+m)', message):
-            color_code = color_map.get(part, None)
+        # Split message by ANSI codes, merging neighbouring parts with the same color
+        for part in _ANSI_RE.split(message):
+            color_code = get_color(part)
             if color_code:  # If part is a color code, update tag_name
                 tag_name = color_code
-                self.gui.output_text.tag_configure(tag_name, foreground=color_code)
-            elif tag_name:  # If part is text and tag_name is set, insert with color
-                self.gui.output_text.insert(tk.END, part, tag_name)
-            else:  # If part is text but no color tag is set, insert without color
-                self.gui.output_text.insert(tk.END, part)
+                if tag_name not in configured_tags:  # tag_configure only once per color
+                    output_text.tag_configure(tag_name, foreground=color_code)
+                    configured_tags.add(tag_name)
+            elif part:
+                tags = tag_name or ()
+                if segments and segments[-1] == tags:
+                    segments[-2] += part
+                else:
+                    segments += [part, tags]
+        segments += ["\n", ()]  # Ensure newline at the end
 
-        self.gui.output_text.insert(tk.END, "\n")  # Ensure newline at the end
-        self.gui.output_text.configure(state='disabled')
-        self.gui.output_text.see(tk.END)
+        output_text.configure(state='normal')
+        output_text.insert(tk.END, *segments)
+        output_text.configure(state='disabled')
+        output_text.see(tk.END)
 
     def start_backup_fn(self):
         self.update_output("Running backup function...\n")
@@ -192,31 +361,24 @@ class PythonInstaller:
             # Copy the current environment and set the encoding to UTF-8
             env = os.environ.copy()
             env['PYTHONIOENCODING'] = 'utf-8'
+            # output goes to a pipe, keep the ANSI colors that update_output renders
+            env['FORCE_COLOR'] = '1'
 
             process = subprocess.Popen(
                 command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env
             )
 
-            # Read stdout and stderr as bytes and then decode manually
-            for stdout_line in iter(process.stdout.readline, b""):
-                decoded_line = stdout_line.decode('utf-8', errors='replace')
-                self.update_output(decoded_line.strip())
-
-            for stderr_line in iter(process.stderr.readline, b""):
-                decoded_line = stderr_line.decode('utf-8', errors='replace')
-                self.update_output(f"ERROR: {decoded_line.strip()}")
-
-            process.stdout.close()
-            process.stderr.close()
+            # Read stdout and stderr as bytes, they are decoded manually
+            self._drain_process_output(process)
             process.wait()
 
             if process.returncode == 0:
-                self.update_output("Backup process completed successfully.\n")
+                self._log_queue.put("Backup process completed successfully.\n")
             else:
-                self.update_output(f"Backup process failed with return code {process.returncode}.\n")
+                self._log_queue.put(f"Backup process failed with return code {process.returncode}.\n")
 
         except Exception as e:
-            self.update_output(f"Error during backup process: {str(e)}\n")
+            self._log_queue.put(f"Error during backup process: {str(e)}\n")
 
 
             
@@ -229,48 +391,55 @@ class PythonInstaller:
 
         if self.selected_python_path:
             self.update_output(f"Starting installation with {self.selected_python_path}...\n")
+            # no second install/backup while this one runs, _after_install enables it again
+            self.gui.install_button.configure(state="disabled")
 
             ## Check if 'venv' directory already exists
             if os.path.exists("venv"):
                 self.update_output("Virtual environment already exists. Skipping installation.\n")
                 print("Virtual environment already exists. Skipping installation.\n")
+                self._after_install(values)
             else:
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    # Run the actual installation and wait for it to complete
-                    future = executor.submit(self.run_requirements_installation_process)
-                    concurrent.futures.wait([future])
-
-                self.update_output("Successfully installed requirements in virtual environment\n")
-                print("Successfully installed requirements in virtual environment.\n")
-
-            ## we makng ifs if user chose to crate db, and what type , file or mariadb
-
-            if values['create_db_radiobutton'] == 'Yes':
-                self.update_output("You chose to create a database.\n")
-
-                if values['db_type_radiobutton'] == 'file':
-                    self.update_output("We will create a file database. SQllite\n")
-                    with concurrent.futures.ThreadPoolExecutor() as executor:
-                        future_backup = executor.submit(self.start_backup_fn)
-                        concurrent.futures.wait([future_backup])
-                        
-                    self.update_output("Database created.\n")
-                else:
-                    self.update_output("We will create a MariaDB database.\n")
-                    self.update_output("Database created.\n")
-                
-            else:
-                self.update_output("You chose not to create a database.\n")
-                
-            
-
-            
+                # Install in the background and continue on the UI thread once it is done
+                threading.Thread(target=self._run_installation_worker, args=(values,), daemon=True).start()
 
         else:
             self.update_output("No Python installation found. Please install Python 3.10 or higher to proceed.")
             self.gui.install_button.configure(state="disabled")
 
-        
+    def _run_installation_worker(self, values):
+        """Worker thread: install requirements, then hand back to the UI thread"""
+        self.run_requirements_installation_process()
+        self.root.after(0, self._after_install, values, True)
+
+    def _after_install(self, values, installed=False):
+        """Continuation of run_installation, runs on the UI thread"""
+        # Keep the installer's own output ahead of the summary below
+        self._write_pending_logs()
+
+        if installed:
+            self.update_output("Successfully installed requirements in virtual environment\n")
+            print("Successfully installed requirements in virtual environment.\n")
+
+        ## we makng ifs if user chose to crate db, and what type , file or mariadb
+
+        if values['create_db_radiobutton'] == 'Yes':
+            self.update_output("You chose to create a database.\n")
+
+            if values['db_type_radiobutton'] == 'file':
+                self.update_output("We will create a file database. SQllite\n")
+                # start_backup_fn only spawns the backup thread, no need to wait on it
+                self.start_backup_fn()
+
+                self.update_output("Database created.\n")
+            else:
+                self.update_output("We will create a MariaDB database.\n")
+                self.update_output("Database created.\n")
+
+        else:
+            self.update_output("You chose not to create a database.\n")
+
+        self.gui.install_button.configure(state="normal")
 
 
 if __name__ == "__main__":
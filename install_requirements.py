@@ -1,29 +1,33 @@
 import os
 import subprocess
-import sys
-import time
+import venv
 
 # Define the virtual environment directory
 venv_dir = "venv"
 
-def create_virtualenv():
+def print_flush(message):
+    print(message, flush=True)
+
+def create_virtualenv(logger=print_flush):
     """Create a virtual environment."""
-    print("Step 1: Creating virtual environment...", flush=True)
+    logger("Step 1: Creating virtual environment...")
+
+    # Create the virtual environment in-process, no extra interpreter launch
+    venv.EnvBuilder(with_pip=True).create(venv_dir)
+    logger("Virtual environment created.")
 
-    # Create the virtual environment
-    subprocess.run([sys.executable, "-m", "venv", venv_dir], check=True)
-    print("Virtual environment created.", flush=True)
+def pip_install_command():
+    """Command that installs requirements.txt with the venv Python."""
+    venv_python = os.path.join(venv_dir, "Scripts", "python.exe") if os.name == "nt" else os.path.join(venv_dir, "bin", "python")
+    return [venv_python, "-m", "pip", "install", "-r", "requirements.txt"]
 
-def install_dependencies():
+def install_dependencies(logger=print_flush):
     """Install dependencies in the virtual environment."""
-    print("Step 2: Installing dependencies...", flush=True)
+    logger("Step 2: Installing dependencies...")
 
-    # Activate the virtual environment and install dependencies
-    venv_python = os.path.join(venv_dir, "Scripts", "python.exe" if os.name == "nt" else "bin/python")
-    
     # Use the venv Python to install dependencies from requirements.txt
-    subprocess.run([venv_python, "-m", "pip", "install", "-r", "requirements.txt"], check=True)
-    print("Dependencies installed.", flush=True)
+    subprocess.run(pip_install_command(), check=True)
+    logger("Dependencies installed.")
 
 def run_installation():
     """Run the installation process."""
@@ -33,8 +37,5 @@ def run_installation():
     # Step 2: Install dependencies
     install_dependencies()
 
-    print("Step 3: Finalizing installation...", flush=True)
-    time.sleep(1)
-
 if __name__ == "__main__":
     run_installation()
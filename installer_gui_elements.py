@@ -1,15 +1,29 @@
+import functools
 from pathlib import Path
 from tkinter import Tk, Canvas, Entry, Text, Button, PhotoImage, ttk, BooleanVar, StringVar
 
+# Asset file name -> absolute path string, resolved once at import
+_ASSET_STR = {path.name: str(path) for path in (Path(__file__).parent / "gui_images").glob("*.png")}
+
+# MariaDB entries: attribute prefix, background image, image center, where the Entry is placed when shown
+_DB_ENTRY_SPECS = [
+    ("db_password", "entry_2.png", (595.0, 187.0), dict(x=555.0, y=179.0, width=80.0, height=14.0)),
+    ("db_username", "entry_3.png", (496.0, 187.0), dict(x=456.0, y=179.0, width=80.0, height=14.0)),
+    ("db_hostname", "entry_4.png", (595.0, 155.0), dict(x=555.0, y=147.0, width=80.0, height=14.0)),
+    ("db_name", "entry_5.png", (496.0, 155.0), dict(x=456.0, y=147.0, width=80.0, height=14.0)),
+]
+
+@functools.lru_cache(maxsize=None)
+def _load_photo(path_str):
+    """Decode each asset once; the cache also keeps the Tk image alive"""
+    return PhotoImage(file=path_str)
+
 class PythonInstallerApp:
     def __init__(self, root, install_callback):
         self.root = root
         self.root.geometry("1000x700")
         self.root.configure(bg="#24282D")
         self.font_family = "Baloo Bhai 2 SemiBold"
-        # Define paths
-        self.OUTPUT_PATH = Path(__file__).parent
-        self.ASSETS_PATH = self.OUTPUT_PATH / "gui_images"
         # Store the callback function
         self.install_callback = install_callback
         # Create the canvas
@@ -35,59 +49,43 @@ class PythonInstallerApp:
 
     def for_mariadb_db_fn(self, *args):
         """Callback for when the user changes the MariaDB database radiobutton"""
-        if self.db_type_variable.get() == "file":
+        if not self._db_widgets_built:
+            return  # Nothing to show or hide yet
+
+        db_type = self.db_type_variable.get()  # One Tcl round trip instead of one per branch
+        if db_type == "file":
             # Hide all input fields and related images
             print("Hiding database inputs")
 
-            # Hide entry images
-            self.canvas.itemconfig(self.db_password_image_id, state='hidden')
-            self.canvas.itemconfig(self.db_username_image_id, state='hidden')
-            self.canvas.itemconfig(self.db_hostname_image_id, state='hidden')
-            self.canvas.itemconfig(self.db_name_image_id, state='hidden')
-            
-            # Hide text images above inputs
-            self.canvas.itemconfig(self.image_5_id, state='hidden')
-            self.canvas.itemconfig(self.image_13_id, state='hidden')
-            self.canvas.itemconfig(self.image_14_id, state='hidden')
-            self.canvas.itemconfig(self.image_15_id, state='hidden')
-            self.canvas.itemconfig(self.image_16_id, state='hidden')
+            # Hide entry images and the text images above inputs, all tagged "dbgrp"
+            self.canvas.itemconfigure("dbgrp", state='hidden')
 
             # Hide entry fields
-            self.db_password_input.place_forget()
-            self.db_username_input.place_forget()
-            self.db_hostname_input.place_forget()
-            self.db_name_input.place_forget()
+            self._place_db_entries(False)
 
-            
-        elif self.db_type_variable.get() == "MariaDB":
+        elif db_type == "MariaDB":
             # Show all input fields and related images
             print("Showing database inputs")
 
-            # Show entry images
-            self.canvas.itemconfig(self.db_password_image_id, state='normal')
-            self.canvas.itemconfig(self.db_username_image_id, state='normal')
-            self.canvas.itemconfig(self.db_hostname_image_id, state='normal')
-            self.canvas.itemconfig(self.db_name_image_id, state='normal')
-
-            # Show text images above inputs
-            self.canvas.itemconfig(self.image_5_id, state='normal')
-            self.canvas.itemconfig(self.image_13_id, state='normal')
-            self.canvas.itemconfig(self.image_14_id, state='normal')
-            self.canvas.itemconfig(self.image_15_id, state='normal')
-            self.canvas.itemconfig(self.image_16_id, state='normal')
+            # Show entry images and the text images above inputs, all tagged "dbgrp"
+            self.canvas.itemconfigure("dbgrp", state='normal')
 
             # Show entry fields
-            self.db_password_input.place(x=555.0, y=179.0, width=80.0, height=14.0)
-            self.db_username_input.place(x=456.0, y=179.0, width=80.0, height=14.0)
-            self.db_hostname_input.place(x=555.0, y=147.0, width=80.0, height=14.0)
-            self.db_name_input.place(x=456.0, y=147.0, width=80.0, height=14.0)
+            self._place_db_entries(True)
 
-           
+    def _place_db_entries(self, show):
+        """Place or hide the MariaDB entry fields"""
+        for entry, place_kwargs in self._db_entry_places:
+            if show:
+                entry.place(**place_kwargs)
+            else:
+                entry.place_forget()
 
     def create_db_or_not_fn(self, *args):
         """Callback for when the user changes the 'Create DB' radiobutton"""
-        if self.create_db_variable.get() == "No":
-            self.canvas.itemconfig(self.image_7_id, state='hidden')
+        create_db = self.create_db_variable.get()
+        if create_db == "No":
+            self.canvas.itemconfig(self._image_ids[7], state='hidden')
             # Hide db_type radio buttons
             self.db_type_file.place_forget()
             self.db_type_mariadb.place_forget()
@@ -96,23 +94,27 @@ class PythonInstallerApp:
             self.db_type_variable.set("file")
             print("Hiding db type")
 
-        elif self.create_db_variable.get() == "Yes":
-            self.canvas.itemconfig(self.image_7_id, state='normal')
+        elif create_db == "Yes":
+            if not self._db_widgets_built:
+                self._build_db_widgets()
+                self.for_mariadb_db_fn()  # Hide or show them for the current db type
+            self.canvas.itemconfig(self._image_ids[7], state='normal')
              # Show db_type radio buttons
             self.db_type_file.place(x=686.0, y=95.0)
             self.db_type_mariadb.place(x=742.0, y=95.0)
             print("Showing db type")
 
 
-    def relative_to_assets(self, path: str) -> Path:
-        return self.ASSETS_PATH / Path(path)
+    def _create_image_fast(self, x, y, image, tags=()):
+        """Same as canvas.create_image, but straight to Tcl without Canvas._create's option parsing"""
+        canvas = self.canvas
+        return canvas.tk.getint(canvas.tk.call(canvas._w, "create", "image", x, y, "-image", image, "-tags", tags))
 
     def create_ui_elements(self):
         
 
         # Make image an attribute of the class
-        self.install_button_image_1 = PhotoImage(
-            file=self.relative_to_assets("button_1.png"))
+        self.install_button_image_1 = _load_photo(_ASSET_STR["button_1.png"])
         
         # Use self.install_button_image_1 here
         self.install_button = Button(
@@ -129,12 +131,11 @@ class PythonInstallerApp:
             height=40.0
         )
 
-        self.output_text_img = PhotoImage(
-            file=self.relative_to_assets("entry_1.png"))
-        self.canvas.create_image(
+        self.output_text_img = _load_photo(_ASSET_STR["entry_1.png"])
+        self._create_image_fast(
             500.0,
             465.5,
-            image=self.output_text_img
+            self.output_text_img
         )
 
         # Creating the Text widget for logs and overlaying it on the background
@@ -159,6 +160,14 @@ class PythonInstallerApp:
 
         ###############################################################################################
         
+        # Shared look of every Entry, set once in the option database instead of per widget
+        self.root.option_add("*Entry.borderWidth", 0)
+        self.root.option_add("*Entry.background", "#992b28")  # Match the dark background images
+        self.root.option_add("*Entry.foreground", "white")  # Light text color for readability
+        self.root.option_add("*Entry.font", (self.font_family, 12))
+        self.root.option_add("*Entry.highlightThickness", 0)
+        self.root.option_add("*Entry.insertBackground", "#A8E1F6")  # Cursor color
+
         # Create the Radiobutton widgets style
         style = ttk.Style()
         # Configure the custom radio button style
@@ -176,8 +185,8 @@ class PythonInstallerApp:
         style.map("Custom.TRadiobutton", background=[("active", "#24282d")])
 
         # Make images instance variables to avoid garbage collection
-        self.normal_image = PhotoImage(file=self.relative_to_assets("orange_unselected.png"))
-        self.selected_image = PhotoImage(file=self.relative_to_assets("orange_selected.png"))
+        self.normal_image = _load_photo(_ASSET_STR["orange_unselected.png"])
+        self.selected_image = _load_photo(_ASSET_STR["orange_selected.png"])
 
         # Ensure images persist in the widget
         style.element_create("Custom.TRadiobutton.indicator", "image", self.normal_image,
@@ -193,7 +202,7 @@ class PythonInstallerApp:
         # Radio button for db creation
         self.create_db_variable = StringVar()  # Make this an instance variable
         self.create_db_variable.set("No")
-        self.create_db_variable.trace("w", self.create_db_or_not_fn)  # Listen for state changes and trigger the function
+        self.create_db_variable.trace_add("write", self.create_db_or_not_fn)  # Listen for state changes and trigger the function
         self.create_db_yes = ttk.Radiobutton(self.root, text=" Yes", variable=self.create_db_variable, value="Yes", style="Custom.TRadiobutton")
         self.create_db_no = ttk.Radiobutton(self.root, text=" No", variable=self.create_db_variable, value="No", style="Custom.TRadiobutton")
 
@@ -204,9 +213,9 @@ class PythonInstallerApp:
         # New Radio button for db_type
         self.db_type_variable = StringVar()  # New variable for the type of database
         self.db_type_variable.set("file")  # Default to 'file'
-        self.db_type_variable.trace("w", self.for_mariadb_db_fn) 
+        self.db_type_variable.trace_add("write", self.for_mariadb_db_fn) 
         # Add tracing for db_type, if needed
-        # self.db_type_variable.trace("w", some_function_to_handle_db_type_change)  # Optional: add a function to handle changes
+        # self.db_type_variable.trace_add("write", some_function_to_handle_db_type_change)  # Optional: add a function to handle changes
 
         self.db_type_file = ttk.Radiobutton(self.root, text=" File", variable=self.db_type_variable, value="file", style="Custom.TRadiobutton")
         self.db_type_mariadb = ttk.Radiobutton(self.root, text=" MariaDB", variable=self.db_type_variable, value="MariaDB", style="Custom.TRadiobutton")
@@ -225,86 +234,16 @@ class PythonInstallerApp:
 
         
 
-       # Entry 2: Setting up the background image and overlaying the Entry widget
-        self.db_password_input_image_2 = PhotoImage(
-            file=self.relative_to_assets("entry_2.png"))
-        self.db_password_image_id = self.canvas.create_image(595.0, 187.0, image=self.db_password_input_image_2)
-
-        self.db_password_input = Entry(
-            bd=0,
-            bg="#992b28",  # Set the background to match the dark background image
-            fg="white",  # Light text color for readability
-            font=(self.font_family, 12),  # Use a suitable font and size
-            highlightthickness=0,
-            insertbackground="#A8E1F6"  # Set the cursor color to match the text color
-        )
-        
-
-        # Entry 3: Setting up the background image and overlaying the Entry widget
-        self.db_username_input_image_3 = PhotoImage(
-            file=self.relative_to_assets("entry_3.png"))
-        self.db_username_image_id = self.canvas.create_image(496.0, 187.0, image=self.db_username_input_image_3)
-
-        self.db_username_input = Entry(
-            bd=0,
-            bg="#992b28",  # Set the background to match the dark background image
-            fg="white",  # Light text color for readability
-            font=(self.font_family, 12),  # Use a suitable font and size
-            highlightthickness=0,
-            insertbackground="#A8E1F6"  # Set the cursor color to match the text color
-        )
-        
-
-        # Entry 4: Setting up the background image and overlaying the Entry widget
-        self.db_hostname_input_image_4 = PhotoImage(
-            file=self.relative_to_assets("entry_4.png"))
-        self.db_hostname_image_id = self.canvas.create_image(595.0, 155.0, image=self.db_hostname_input_image_4)
-
-        self.db_hostname_input = Entry(
-            bd=0,
-            bg="#992b28",  # Set the background to match the dark background image
-            fg="white",  # Light text color for readability
-            font=(self.font_family, 12),  # Use a suitable font and size
-            highlightthickness=0,
-            insertbackground="#A8E1F6"  # Set the cursor color to match the text color
-        )
-        
-
-        # Entry 5: Setting up the background image and overlaying the Entry widget
-        self.db_name_input_image_5 = PhotoImage(
-            file=self.relative_to_assets("entry_5.png"))
-        
-        self.db_name_image_id = self.canvas.create_image(496.0, 155.0, image=self.db_name_input_image_5)
-
-        self.db_name_input = Entry(
-            bd=0,
-            bg="#992b28",  # Set the background to match the dark background image
-            fg="white",  # Light text color for readability
-            font=(self.font_family, 12),  # Use a suitable font and size
-            highlightthickness=0,
-            insertbackground="#A8E1F6"  # Set the cursor color to match the text color
-        )
-        
-        
-
         # Setting up the background image
-        self.username_input_img = PhotoImage(
-            file=self.relative_to_assets("entry_6.png"))
-        self.canvas.create_image(
+        self.username_input_img = _load_photo(_ASSET_STR["entry_6.png"])
+        self._create_image_fast(
             345.0,
             184.0,
-            image=self.username_input_img
+            self.username_input_img
         )
 
         # Creating the Entry widget for user input and overlaying it on the background
-        self.username_input = Entry(
-            bd=0,
-            bg="#992b28",  # Set the background to match or be transparent on the dark background image
-            fg="white",  # Light text color for readability
-            font=(self.font_family, 12),  # Use a suitable font and size
-            highlightthickness=0,
-            insertbackground="#A8E1F6"  # Set the cursor color to be consistent with the text color
-        )
+        self.username_input = Entry()
         self.username_input.place(
             x=258.0,
             y=174.0,
@@ -313,7 +252,9 @@ class PythonInstallerApp:
         )
 
 
-        self.image_ids = {}
+        # Images and their canvas ids, indexed by the number in the file name (index 0 unused)
+        self._images = [None] * 17
+        self._image_ids = [None] * 17
 
         # Create a list of image data, image name, x, and y coordinates
         image_data = [
@@ -335,14 +276,21 @@ class PythonInstallerApp:
             ("image_16.png", 496.0, 209.0)
         ]
 
-        # Create images and store their IDs in a dictionary
+        # Text images above the MariaDB inputs, built later together with them
+        db_image_indexes = {5, 13, 14, 15, 16}
+        self._db_label_images = []
+
+        # Create images and store their IDs
         for index, (file_name, x, y) in enumerate(image_data, start=1):
-            image_attr = f"image_image_{index}"
-            image_id_attr = f"image_{index}_id"
-            setattr(self, image_attr, PhotoImage(file=self.relative_to_assets(file_name)))
-            image_id = self.canvas.create_image(x, y, image=getattr(self, image_attr))
-            setattr(self, image_id_attr, image_id)
-            self.image_ids[image_id_attr] = image_id
+            if index in db_image_indexes:
+                self._db_label_images.append((index, file_name, x, y))
+                continue
+            img = _load_photo(_ASSET_STR[file_name])
+            self._images[index] = img
+            self._image_ids[index] = self._create_image_fast(x, y, img)
+
+        # MariaDB inputs are only built once the user picks 'Create DB: Yes'
+        self._db_widgets_built = False
 
                 
 
@@ -351,12 +299,33 @@ class PythonInstallerApp:
         self.create_db_or_not_fn(self)
         
     
+    def _build_db_widgets(self):
+        """Create the MariaDB inputs and their images, deferred until they can be shown"""
+        # Entries 2-5: background image with the Entry widget overlaid on it
+        self._db_entry_places = []
+        for name, file_name, (x, y), place_kwargs in _DB_ENTRY_SPECS:
+            img = _load_photo(_ASSET_STR[file_name])
+            setattr(self, f"{name}_input_img", img)
+            setattr(self, f"{name}_image_id", self._create_image_fast(x, y, img, tags="dbgrp"))
+            entry = Entry()
+            setattr(self, f"{name}_input", entry)
+            self._db_entry_places.append((entry, place_kwargs))
+
+        # Text images above inputs
+        for index, file_name, x, y in self._db_label_images:
+            img = _load_photo(_ASSET_STR[file_name])
+            self._images[index] = img
+            self._image_ids[index] = self._create_image_fast(x, y, img, tags="dbgrp")
+
+        self._db_widgets_built = True
+
     # gerrer method for all values from inputs and radio buttons
     def get_all_values(self):
+        db_built = self._db_widgets_built
         return {
-            "db_name": self.db_name_input.get(),
-            "db_password": self.db_password_input.get(),
-            "db_username": self.db_username_input.get(),
+            "db_name": self.db_name_input.get() if db_built else "",
+            "db_password": self.db_password_input.get() if db_built else "",
+            "db_username": self.db_username_input.get() if db_built else "",
             "username_or_id": self.username_input.get(),
             "create_db_radiobutton": self.create_db_variable.get(),
             "db_type_radiobutton": self.db_type_variable.get()
@@ -398,47 +398,20 @@ try: # open connection to database
                 updatedAt_datetime = datetime.fromtimestamp(updatedAt_parsed)
 
                 # Convert the datetime object to a string in the correct format
-                updatedAt_parsed = updatedAt_datetime.strftime('%Y-%m-%d %H:%M:?')
+                updatedAt_parsed = updatedAt_datetime.strftime('%Y-%m-%d %H:%M:%S')
 
                 # Convert the Unix timestamp to a Python datetime object
                 entry_createdAt_datetime = datetime.fromtimestamp(entry_createdAt_parsed)
 
                 # Convert the datetime object to a string in the correct format
-                entry_createdAt_parsed = entry_createdAt_datetime.strftime('%Y-%m-%d %H:%M:?')
+                entry_createdAt_parsed = entry_createdAt_datetime.strftime('%Y-%m-%d %H:%M:%S')
                 #print("cleanded_user_startedAt : ", cleanded_user_startedAt)
                 #print("cleanded_user_completedAt : ", cleanded_user_completedAt)
                 
-                # rekor[18] is last_updated_on_site
+                # rekor[18] is last_updated_on_site, written with the same format as updatedAt_parsed,
+                # so the strings compare directly without parsing either side back to a timestamp
                 if record:
-                    if record[18] is not None:
-                        # Check if record[18] is a string and convert it to datetime object
-                        if isinstance(record[18], str):
-                            try:
-                                db_datetime = datetime.strptime(record[18], '%Y-%m-%d %H:%M:?')
-                                db_timestamp = int(time.mktime(db_datetime.timetuple()))
-                            except ValueError:
-                                # Handle the exception if the date format is incorrect
-                                print("Date format is incorrect")
-                                db_timestamp = None
-                        else:
-                            # If record[18] is already a datetime object
-                            db_timestamp = int(time.mktime(record[18].timetuple()))
-                    else:
-                        db_timestamp = None
-
-                    if db_timestamp is not None and updatedAt_parsed is not None:
-                        updatedAt_timestamp = int(time.mktime(time.strptime(updatedAt_parsed, '%Y-%m-%d %H:%M:?')))
-                    else:
-                        updatedAt_timestamp = None
-
-                    # print(f"updatedAt_parsed: {updatedAt_parsed}")
-                    # print("db_timestamp: " + str(db_timestamp))
-                    # print("updatedAt_timestamp: " + str(updatedAt_timestamp))
-                    # print(f"rekors 18 : {record[18]} for anime {romaji_parsed}")
-                    #       
-                    if db_timestamp != updatedAt_timestamp:
-                        
-                    #if record[18] != updatedAt_parsed:
+                    if record[18] != updatedAt_parsed:
                         update_query = """
                         UPDATE `manga_list` SET  
                             id_anilist = ?,
@@ -1,34 +1,184 @@
-import json
+import os
 import time
 import requests
 import sqlite3
 import argparse
 import sys
+import threading
+import queue
 
 from tqdm import tqdm
 from datetime import datetime
 
-# ANSI escape sequences for colors
-RESET = "\033[0m"
-RED = "\033[31m"
-GREEN = "\033[32m"
-YELLOW = "\033[33m"
-BLUE = "\033[34m"
-MAGENTA = "\033[35m"
-CYAN = "\033[36m"
-WHITE = "\033[37m"
+# orjson parses the AniList pages much faster, stdlib json is the fallback
+try:
+    import orjson as _json
+
+    def _dumps(obj):
+        return _json.dumps(obj).decode()
+except ImportError:
+    import json as _json
+    _dumps = _json.dumps
+
+# ANSI escape sequences for colors, only when writing to a terminal
+# or when the reader renders them itself (the installer sets FORCE_COLOR)
+_USE_COLOR = os.environ.get("FORCE_COLOR") not in (None, "", "0") or (sys.stdout is not None and sys.stdout.isatty())
+
+RESET = "\033[0m" if _USE_COLOR else ""
+RED = "\033[31m" if _USE_COLOR else ""
+GREEN = "\033[32m" if _USE_COLOR else ""
+YELLOW = "\033[33m" if _USE_COLOR else ""
+BLUE = "\033[34m" if _USE_COLOR else ""
+MAGENTA = "\033[35m" if _USE_COLOR else ""
+CYAN = "\033[36m" if _USE_COLOR else ""
+WHITE = "\033[37m" if _USE_COLOR else ""
+
+# pages fetched ahead of the database writes, spaced out because AniList allows ~90 requests a minute
+PAGE_PREFETCH_DEPTH = 2
+PAGE_FETCH_INTERVAL = 1 / 1.3
+
+# format of last_updated_on_site and entry_createdAt in manga_list
+SITE_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+ANILIST_URL = 'https://graphql.anilist.co'
+
+USER_ID_QUERY = '''
+    query ($name: String) {
+        User(name: $name) {
+            id
+            name
+            }
+        }
+    '''
 
+MANGA_LIST_QUERY = '''
+    query ($page: Int, $perPage: Int, $userId: Int) {
+        Page(page: $page, perPage: $perPage) {
+            pageInfo {
+                perPage
+                currentPage
+                lastPage
+                hasNextPage
+            }
+            mediaList(userId: $userId, type: MANGA) {
+                status
+                mediaId
+                score
+                progress
+                progressVolumes
+                repeat
+                updatedAt
+                createdAt
+                startedAt {
+                    year
+                    month
+                    day
+                }
+                completedAt {
+                    year
+                    month
+                    day
+                }
+                media {
+                    title {
+                        romaji
+                        english
+                    }
+                    idMal
+                    format
+                    status
+                    description
+                    chapters
+                    volumes
+                    coverImage {
+                        large
+                    }
+                    isFavourite
+                    siteUrl
+                    countryOfOrigin
+                    startDate {
+                        year
+                        month
+                        day
+                    }
+                    endDate {
+                        year
+                        month
+                        day
+                    }
+                    genres
+                    externalLinks {
+                        url
+                    }
+                }
+                notes
+            }
+        }
+    }
+    '''
+
+# Rows are collected per page and written with executemany, one transaction per page.
+# New ids are inserted, known ids are updated only when AniList's updatedAt moved.
+UPSERT_MANGA_QUERY = """
+INSERT INTO `manga_list` (
+    `id_anilist`, `id_mal`, `title_english`, `title_romaji`, `on_list_status`, `status`, `media_format`, 
+    `all_chapters`, `all_volumes`, `chapters_progress`, `volumes_progress`, `score`, `reread_times`, `cover_image`, 
+    `is_favourite`, `anilist_url`, `mal_url`, `last_updated_on_site`, `entry_createdAt`, `user_startedAt`, 
+    `user_completedAt`, `notes`, `description`, `country_of_origin`, `media_start_date`, `media_end_date`, `genres`, `external_links`
+) VALUES (
+    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+)
+ON CONFLICT(id_anilist) DO UPDATE SET
+    id_mal = excluded.id_mal,
+    title_english = excluded.title_english,
+    title_romaji = excluded.title_romaji,
+    on_list_status = excluded.on_list_status,
+    status = excluded.status,
+    media_format = excluded.media_format,
+    all_chapters = excluded.all_chapters,
+    all_volumes = excluded.all_volumes,
+    chapters_progress = excluded.chapters_progress,
+    volumes_progress = excluded.volumes_progress,
+    score = excluded.score,
+    reread_times = excluded.reread_times,
+    cover_image = excluded.cover_image,
+    is_favourite = excluded.is_favourite,
+    anilist_url = excluded.anilist_url,
+    mal_url = excluded.mal_url,
+    last_updated_on_site = excluded.last_updated_on_site,
+    entry_createdAt = excluded.entry_createdAt,
+    user_startedAt = excluded.user_startedAt,
+    user_completedAt = excluded.user_completedAt,
+    notes = excluded.notes,
+    description = excluded.description,
+    country_of_origin = excluded.country_of_origin,
+    media_start_date = excluded.media_start_date,
+    media_end_date = excluded.media_end_date,
+    genres = excluded.genres,
+    external_links = excluded.external_links
+WHERE excluded.last_updated_on_site IS NOT manga_list.last_updated_on_site;
+"""
 
 
 def start_backup(input_value, db_type, logger):
     i = 1
-    j = 0
     how_many_anime_in_one_request = 50 #max 50
     total_updated = 0
     total_added = 0
 
     logger(f"{YELLOW}Database type: {db_type}{RESET}")
     conn = sqlite3.connect('anilist_db.db')
+    # WAL + relaxed fsync for this write-heavy sync, bigger page cache kept in memory
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-64000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA busy_timeout=5000")
+
+    # one keep-alive connection to AniList for the user lookup and every page
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
     
 
     
@@ -39,64 +189,45 @@ def start_backup(input_value, db_type, logger):
             'name' : input_value
         }
 
-        api_request  = '''
-            query ($name: String) {
-                User(name: $name) {
-                    id
-                    name
-                    }
-                }
-            '''
-        url = 'https://graphql.anilist.co'
             # sending api request
-        response_frop_anilist = requests.post(url, json={'query': api_request, 'variables': variables_in_api})
+        response_frop_anilist = session.post(ANILIST_URL, json={'query': USER_ID_QUERY, 'variables': variables_in_api})
             # take api response to python dictionary to parse json
-        parsed_json = json.loads(response_frop_anilist.text)
+        parsed_json = _json.loads(response_frop_anilist.content)
         user_id = parsed_json["data"]["User"]["id"]
         logger(f"{BLUE}your user id is: {GREEN}{user_id}{RESET}")
         
 
 
 
-    def how_many_rows(query):
-        """Add a pair of question and answer to the general table in the database"""
+    def load_existing_map():
+        """Map id_anilist to last_updated_on_site for every row already in manga_list"""
         
         cursor = conn.cursor()
-        cursor.execute(query)
-        output = cursor.fetchall()
-        logger(f"{BLUE}Total number of rows in table: {cursor.rowcount}{RESET}")
-        #logger(f"{BLUE}Total number of rows in table: {cursor.rowcount}{RESET}")
-        conn.commit()
-            #wait 1 second so you can see number of rows in table
-        time.sleep(1)
-        return output
-
-    def check_record(media_id):
-        """Check if a record with the given media_id exists in the manga_list table in the database"""
+        cursor.execute("SELECT id_anilist, last_updated_on_site FROM manga_list")
+        # rows stream straight from the cursor into the dict, no intermediate list
+        existing = {row[0]: row[1] for row in cursor}
+        logger(f"{BLUE}Total number of rows in table: {len(existing)}{RESET}")
+        return existing
+
+    def add_update_to_batch(page_rows, manga_record, romaji):
+        """Queue a record update for the manga_list table, written at the end of the page"""
         
-        check_record_query = "SELECT * FROM manga_list WHERE id_anilist = ?"
-        cursor.execute(check_record_query, (media_id,))
-        record = cursor.fetchone()
-        return record
+        page_rows.append(manga_record)
+        logger(f"{BLUE}updated record ^^ {romaji}{RESET}")
 
-    def update_querry_to_db(insert_query, insert_record):
-        """Update a record in the manga_list table in the database"""
-        
-        global cleaned_romaji
-        cursor = conn.cursor()
-        cursor.execute(insert_query, insert_record)
-        logger(f"{BLUE}updated record ^^ {cleaned_romaji}{RESET}")
-
-    def insert_querry_to_db(insert_query, insert_record, what_type_updated):
-        """Insert a record into the manga_list table in the database"""
+    def add_insert_to_batch(page_rows, manga_record, what_type_updated):
+        """Queue a record insert into the manga_list table, written at the end of the page"""
          
-        cursor = conn.cursor()
-        cursor.execute(insert_query, insert_record)
+        page_rows.append(manga_record)
         if what_type_updated == "MANGA":
             logger(f"{MAGENTA}...added ^^ manga to database.{RESET}")
         elif what_type_updated == "NOVEL":
             logger(f"{MAGENTA}...added ^^ novel to database.{RESET}")
         
+    # parsed pages (or the fetch error) handed from the fetch thread to the database loop
+    pages = queue.Queue(maxsize=PAGE_PREFETCH_DEPTH)
+    stop_fetching = threading.Event()
+
     try: # open connection to database
         
         cursor = conn.cursor()
@@ -146,97 +277,78 @@ def start_backup(input_value, db_type, logger):
             """
             cursor.execute(create_table_query)
             logger(f"{GREEN}Table created successfully in MySQL{RESET}")
+        # unique index on the AniList id, the key every sync looks entries up by
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_manga_list_anilist'")
+        if cursor.fetchone() is None:
+            # tables written without the index may hold the same entry twice, keep the newest row
+            cursor.execute("DELETE FROM manga_list WHERE id_default NOT IN (SELECT MAX(id_default) FROM manga_list GROUP BY id_anilist)")
+            if cursor.rowcount > 0:
+                logger(f"{YELLOW}Removed {cursor.rowcount} duplicate entries{RESET}")
+            cursor.execute("CREATE UNIQUE INDEX idx_manga_list_anilist ON manga_list(id_anilist)")
+        # older versions wrote a literal '?' instead of the seconds, give those rows real seconds,
+        # once per database, user_version records that the backfill is done
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] < 1:
+            for column in ("last_updated_on_site", "entry_createdAt"):
+                cursor.execute(f"UPDATE manga_list SET {column} = REPLACE({column}, ':?', ':00') WHERE {column} LIKE '%:?'")
+            cursor.execute("PRAGMA user_version = 1")
+        conn.commit()
             # need to take all records from database to compare entries
-        take_all_records = "select id_anilist, last_updated_on_site from manga_list"
-        
-        #cursor.execute(take_all_records)
-        all_records = how_many_rows(take_all_records)
-            # get all records
+        # id_anilist -> last_updated_on_site, looked up in memory instead of one SELECT per entry
+        existing = load_existing_map()
         
         # Customize the progress bar format
         
         
-        has_next_page = True
-        
-        while has_next_page:
-            
+        def fetch_page(page):
+            """Fetch one page of the user's manga list"""
             variables_in_api = {
-            'page' : i,
+            'page' : page,
             'perPage' : how_many_anime_in_one_request,
             'userId' : user_id
             }
-
-            api_request  = '''
-                query ($page: Int, $perPage: Int, $userId: Int) {
-            Page(page: $page, perPage: $perPage) {
-            pageInfo {
-            perPage
-            currentPage
-            lastPage
-            hasNextPage
-            }
-            mediaList(userId: $userId, type: MANGA) {
-            status
-            mediaId
-            score
-            progress
-            progressVolumes
-            repeat
-            updatedAt
-            createdAt
-            startedAt {
-                year
-                month
-                day
-            }
-            completedAt {
-                year
-                month
-                day
-            }
-            media {
-                title {
-                romaji
-                english
-                }
-                idMal
-                format
-                status
-                description
-                chapters
-                volumes
-                coverImage {
-                large
-                }
-                isFavourite
-                siteUrl
-                countryOfOrigin
-                startDate {
-                year
-                month
-                day
-            }
-            endDate {
-                year
-                month
-                day
-            }
-            genres
-            externalLinks {
-                url
-            }
-            }
-            notes
-                }
-            }
-            }
-                '''
-            url = 'https://graphql.anilist.co'
                 # sending api request
-            response_frop_anilist = requests.post(url, json={'query': api_request, 'variables': variables_in_api})
-
+            response_frop_anilist = session.post(ANILIST_URL, json={'query': MANGA_LIST_QUERY, 'variables': variables_in_api})
                 # take api response to python dictionary to parse json
-            parsed_json = json.loads(response_frop_anilist.text)
+            return _json.loads(response_frop_anilist.content)
+
+        def put_page(item):
+            """Queue a fetched page, giving up once the database loop has stopped"""
+            while not stop_fetching.is_set():
+                try:
+                    pages.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+
+        def produce_pages():
+            """Fetch pages in order on a background thread until AniList reports no next page"""
+            page = 1
+            try:
+                while not stop_fetching.is_set():
+                    started = time.monotonic()
+                    parsed = fetch_page(page)
+                    put_page(parsed)
+                    if not parsed["data"]["Page"]["pageInfo"]["hasNextPage"]:
+                        return
+                    page += 1
+                    wait = started + PAGE_FETCH_INTERVAL - time.monotonic()
+                    if wait > 0:
+                        time.sleep(wait)
+            except Exception as e:
+                put_page(e)
+
+        # network fetches overlap the database writes, sqlite stays on this thread only
+        threading.Thread(target=produce_pages, daemon=True).start()
+
+        has_next_page = True
+        
+        while has_next_page:
+            page_rows = []
+
+            parsed_json = pages.get()
+            if isinstance(parsed_json, Exception):
+                raise parsed_json
             
             logger(f"{RED}page {i}{RESET}")
 
@@ -245,50 +357,45 @@ def start_backup(input_value, db_type, logger):
             # total_updated = 0
             # total_added = 0
             # this loop is defined by how many perPage is on one request (50 by default and max)
-            for j in range(len(parsed_json["data"]["Page"]["mediaList"])):   # it needs to add one anime at 1 loop go
+            media_list = parsed_json["data"]["Page"]["mediaList"]
+            for entry in media_list:   # it needs to add one anime at 1 loop go
 
-                on_list_status = mediaId = score = progress = volumes_progress = repeat = updatedAt = entry_createdAt = notes = parsed_json["data"]["Page"]["mediaList"][j]
-                
-                    # title
-                english = romaji = parsed_json["data"]["Page"]["mediaList"][j]["media"]["title"]
-                    # mediaList - media
-                idMal = formatt = status  = chapters = volumes = isFavourite = siteUrl = description = country = genres = parsed_json["data"]["Page"]["mediaList"][j]["media"]
-                    # coverimage
-                large = parsed_json["data"]["Page"]["mediaList"][j]["media"]["coverImage"]
+                media = entry["media"]
+                title = media["title"]
                     # user startedAt
-                user_startedAt = parsed_json["data"]["Page"]["mediaList"][j]["startedAt"]
+                user_startedAt = entry["startedAt"]
                     # user completedAt
-                user_completedAt = parsed_json["data"]["Page"]["mediaList"][j]["completedAt"]
+                user_completedAt = entry["completedAt"]
                     # media startedAt
-                media_startDate = parsed_json["data"]["Page"]["mediaList"][j]["media"]["startDate"]
+                media_startDate = media["startDate"]
                     # media completedAt
-                media_endDate = parsed_json["data"]["Page"]["mediaList"][j]["media"]["endDate"]
+                media_endDate = media["endDate"]
                     # media external links
-                media_externalLinks = parsed_json["data"]["Page"]["mediaList"][j]["media"]["externalLinks"]
-
-                on_list_status_parsed = on_list_status["status"]
-                mediaId_parsed = mediaId["mediaId"]
-                score_parsed = score["score"]
-                progress_parsed = progress["progress"]
-                volumes_progress_parsed = volumes_progress["progressVolumes"]
-                repeat_parsed = repeat["repeat"]
-                english_parsed = english["english"]
-                romaji_parsed = romaji["romaji"]
-                idMal_parsed = idMal["idMal"]
-                format_parsed = formatt["format"]
-                status_parsed = status["status"]
+                media_externalLinks = media["externalLinks"]
+
+                on_list_status_parsed = entry["status"]
+                mediaId_parsed = entry["mediaId"]
+                score_parsed = entry["score"]
+                progress_parsed = entry["progress"]
+                volumes_progress_parsed = entry["progressVolumes"]
+                repeat_parsed = entry["repeat"]
+                english_parsed = title["english"]
+                romaji_parsed = title["romaji"]
+                idMal_parsed = media["idMal"]
+                format_parsed = media["format"]
+                status_parsed = media["status"]
                 
-                updatedAt_parsed = updatedAt["updatedAt"]
+                updatedAt_parsed = entry["updatedAt"]
                 
-                chapters_parsed = chapters["chapters"]
-                volumes_parsed = volumes["volumes"]
-                large_parsed = large["large"]
-                isFavourite_parsed = isFavourite["isFavourite"]
-                siteUrl_parsed = siteUrl["siteUrl"]
-                notes_parsed = notes["notes"]
-                description_parsed = description["description"]
-                entry_createdAt_parsed = entry_createdAt["createdAt"]
-                country_parsed = country["countryOfOrigin"]
+                chapters_parsed = media["chapters"]
+                volumes_parsed = media["volumes"]
+                large_parsed = media["coverImage"]["large"]
+                isFavourite_parsed = media["isFavourite"]
+                siteUrl_parsed = media["siteUrl"]
+                notes_parsed = entry["notes"]
+                description_parsed = media["description"]
+                entry_createdAt_parsed = entry["createdAt"]
+                country_parsed = media["countryOfOrigin"]
 
                     # started at 
                 user_startedAt_year = user_startedAt["year"]
@@ -311,32 +418,21 @@ def start_backup(input_value, db_type, logger):
                 media_endDate_day = media_endDate["day"]
 
 
-                # Initialize an empty list to store the parsed URLs
-                media_externalLinks_parsed = []
-
-                # Iterate through each item in the media_externalLinks list
-                for link in media_externalLinks:
-                    # Extract the URL and append it to the media_externalLinks_parsed list
-                    url = link["url"]
-                    media_externalLinks_parsed.append(url)
-
-                # Assuming external_links is a Python list
-                external_links_json = json.dumps(media_externalLinks_parsed)
-                # Initialize an empty list to store the parsed URLs
+                # Extract the URL of every external link
+                external_links_json = _dumps([link["url"] for link in media_externalLinks])
                 # Extract genres
-                genres_parsed = genres['genres']
+                genres_parsed = media['genres']
 
                 # Convert genres list to JSON string
-                genres_json = json.dumps(genres_parsed)
-
-                    # cleaning strings and formating
-                cleaned_english = str(english_parsed).replace("'" , '"')
-                cleaned_romaji = str(romaji_parsed).replace("'" , '"')
-                cleaned_notes = str(notes_parsed).replace("'" , '"')
-                isFavourite_parsed = str(isFavourite_parsed).replace("True" , "1")
-                isFavourite_parsed = str(isFavourite_parsed).replace("False" , "0")
-                cleaned_description = str(description_parsed).replace("<br><br>" , '<br>')
-                cleaned_description = str(cleaned_description).replace("'" , '"')       
+                genres_json = _dumps(genres_parsed)
+
+                    # values are bound as query parameters, so apostrophes are kept as they are;
+                    # missing titles/notes stay the "None" string the web app checks for
+                cleaned_english = str(english_parsed)
+                cleaned_romaji = str(romaji_parsed)
+                cleaned_notes = str(notes_parsed)
+                isFavourite_parsed = 1 if isFavourite_parsed else 0
+                cleaned_description = (description_parsed or "").replace("<br><br>" , '<br>')
                 mal_url_parsed = "https://myanimelist.net/manga/" + str(idMal_parsed)
 
     
@@ -355,165 +451,68 @@ def start_backup(input_value, db_type, logger):
                 volumes_parsed = '0' if volumes_parsed is None else volumes_parsed
 
                 #logger(f"{RED}entry_createdAt_parsed : {cleanded_user_completedAt}{RESET}")
-                updated_at_for_loop = updatedAt["updatedAt"]
+                updated_at_for_loop = entry["updatedAt"]
 
                 
     
                 
                 tqdm.write(f"{GREEN}Checking for mediaId: {mediaId_parsed}{RESET}")
-                record = check_record(mediaId_parsed)
-                #logger(f"{RED}record : {record}{RESET}")
+                in_table = mediaId_parsed in existing
+                prior_ts = existing.get(mediaId_parsed)
                 
-                if entry_createdAt_parsed == 'NULL':
-                    created_at_for_db = 'NULL'
-                elif entry_createdAt_parsed == 0:
-                    created_at_for_db = 'NULL'
-                else:
-                    created_at_for_db = f"FROM_UNIXTIME({entry_createdAt_parsed})"
-
-                if updatedAt_parsed == 'NULL':
-                    updatedAt_parsed_for_db = 'NULL'
-                elif updatedAt_parsed == 0:
-                    updatedAt_parsed_for_db = 'NULL'
-                else:
-                    updatedAt_parsed_for_db = f"FROM_UNIXTIME({updatedAt_parsed})"
-
                 #logger("idMal_parsed : ", idMal_parsed)
                 if idMal_parsed is None:
                     idMal_parsed = 0
                 #logger("changed idMal_parsed : ", idMal_parsed)
-                # Convert the Unix timestamp to a Python datetime object
-                updatedAt_datetime = datetime.fromtimestamp(updatedAt_parsed)
-
-                # Convert the datetime object to a string in the correct format
-                updatedAt_parsed = updatedAt_datetime.strftime('%Y-%m-%d %H:%M:?')
-
-                # Convert the Unix timestamp to a Python datetime object
-                entry_createdAt_datetime = datetime.fromtimestamp(entry_createdAt_parsed)
+                # Convert the Unix timestamps to strings in the correct format,
+                # AniList sends 0 (or nothing) when there is no date, stored as NULL
+                if updatedAt_parsed:
+                    updatedAt_parsed = datetime.fromtimestamp(updatedAt_parsed).strftime(SITE_DATETIME_FORMAT)
+                else:
+                    updatedAt_parsed = None
 
-                # Convert the datetime object to a string in the correct format
-                entry_createdAt_parsed = entry_createdAt_datetime.strftime('%Y-%m-%d %H:%M:?')
+                if entry_createdAt_parsed:
+                    entry_createdAt_parsed = datetime.fromtimestamp(entry_createdAt_parsed).strftime(SITE_DATETIME_FORMAT)
+                else:
+                    entry_createdAt_parsed = None
                 #logger("cleanded_user_startedAt : ", cleanded_user_startedAt)
                 #logger("cleanded_user_completedAt : ", cleanded_user_completedAt)
                 
-                # rekor[18] is last_updated_on_site
-                if record:
-                    if record[18] is not None:
-                        # Check if record[18] is a string and convert it to datetime object
-                        if isinstance(record[18], str):
-                            try:
-                                db_datetime = datetime.strptime(record[18], '%Y-%m-%d %H:%M:?')
-                                db_timestamp = int(time.mktime(db_datetime.timetuple()))
-                            except ValueError:
-                                # Handle the exception if the date format is incorrect
-                                logger("Date format is incorrect")
-                                db_timestamp = None
-                        else:
-                            # If record[18] is already a datetime object
-                            db_timestamp = int(time.mktime(record[18].timetuple()))
-                    else:
-                        db_timestamp = None
-
-                    if db_timestamp is not None and updatedAt_parsed is not None:
-                        updatedAt_timestamp = int(time.mktime(time.strptime(updatedAt_parsed, '%Y-%m-%d %H:%M:?')))
-                    else:
-                        updatedAt_timestamp = None
-
-                    # logger(f"updatedAt_parsed: {updatedAt_parsed}")
-                    # logger("db_timestamp: " + str(db_timestamp))
-                    # logger("updatedAt_timestamp: " + str(updatedAt_timestamp))
-                    # logger(f"rekors 18 : {record[18]} for anime {romaji_parsed}")
-                    #       
-                    if db_timestamp != updatedAt_timestamp:
-                        
-                    #if record[18] != updatedAt_parsed:
-                        update_query = """
-                        UPDATE `manga_list` SET  
-                            id_anilist = ?,
-                            id_mal = ?,
-                            title_english = ?,
-                            title_romaji = ?,
-                            on_list_status = ?,
-                            status = ?,
-                            media_format = ?,
-                            all_chapters = ?,
-                            all_volumes = ?,
-                            chapters_progress = ?,
-                            volumes_progress = ?,
-                            score = ?,
-                            reread_times = ?,
-                            cover_image = ?,
-                            is_favourite = ?,
-                            anilist_url = ?,
-                            mal_url = ?,
-                            last_updated_on_site = ?,
-                            entry_createdAt = ?,
-                            user_startedAt = ?,
-                            user_completedAt = ?,
-                            notes = ?,
-                            description = ?,
-                            country_of_origin = ?,
-                            media_start_date = ?,
-                            media_end_date = ?,
-                            genres = ?,
-                            external_links = ?
-                        WHERE id_anilist = ?;
-                        """
-
-                        update_record = (
-                            mediaId_parsed, idMal_parsed, cleaned_english, cleaned_romaji, on_list_status_parsed, status_parsed, format_parsed, 
-                            chapters_parsed, volumes_parsed, progress_parsed, volumes_progress_parsed, score_parsed, repeat_parsed, large_parsed, 
-                            isFavourite_parsed, siteUrl_parsed, mal_url_parsed, updatedAt_parsed, 
-                            entry_createdAt_parsed, cleanded_user_startedAt, cleanded_user_completedAt, cleaned_notes, cleaned_description, 
-                            country_parsed, media_startDate_parsed, media_endDate_parsed, genres_json, external_links_json, mediaId_parsed  # ID again for WHERE clause
-                        )
-
-                        # Execute the query
-                        update_querry_to_db(update_query, update_record)
-
-
+                manga_record = (
+                    mediaId_parsed, idMal_parsed, cleaned_english, cleaned_romaji, on_list_status_parsed, status_parsed, format_parsed, 
+                    chapters_parsed, volumes_parsed, progress_parsed, volumes_progress_parsed, score_parsed, repeat_parsed, large_parsed, 
+                    isFavourite_parsed, siteUrl_parsed, mal_url_parsed, updatedAt_parsed, entry_createdAt_parsed, 
+                    cleanded_user_startedAt, cleanded_user_completedAt, cleaned_notes, cleaned_description, 
+                    country_parsed, media_startDate_parsed, media_endDate_parsed, genres_json, external_links_json
+                )
+
+                # the upsert decides insert vs update on its own, existing is only used to skip
+                # unchanged entries and keep the added/updated messages.
+                # prior_ts is last_updated_on_site, written with the same format as updatedAt_parsed,
+                # so the strings compare directly without parsing either side back to a timestamp
+                if in_table:
+                    if prior_ts != updatedAt_parsed:
+                        add_update_to_batch(page_rows, manga_record, cleaned_romaji)
+                        existing[mediaId_parsed] = updatedAt_parsed
                         total_updated += 1
                         
-
                 else:
                     if format_parsed == "NOVEL":
                         logger(f"{RED}This novel is not in a table: {cleaned_romaji}{RESET}")
                     elif format_parsed == "MANGA":
                         logger(f"{CYAN}This manga is not in a table: {cleaned_romaji}{RESET}")
 
-                    
-                        # building querry to insert to table
-                    insert_query = """
-                    INSERT INTO `manga_list` (
-                        `id_anilist`, `id_mal`, `title_english`, `title_romaji`, `on_list_status`, `status`, `media_format`, 
-                        `all_chapters`, `all_volumes`, `chapters_progress`, `volumes_progress`, `score`, `reread_times`, `cover_image`, 
-                        `is_favourite`, `anilist_url`, `mal_url`, `last_updated_on_site`, `entry_createdAt`, `user_startedAt`, 
-                        `user_completedAt`, `notes`, `description`, `country_of_origin`, `media_start_date`, `media_end_date`, `genres`, `external_links`
-                    ) VALUES (
-                        ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
-                    );
-                    """
-
-                    insert_record = (
-                        mediaId_parsed, idMal_parsed, cleaned_english, cleaned_romaji, on_list_status_parsed, status_parsed, format_parsed, 
-                        chapters_parsed, volumes_parsed, progress_parsed, volumes_progress_parsed, score_parsed, repeat_parsed, large_parsed, 
-                        isFavourite_parsed, siteUrl_parsed, mal_url_parsed, updatedAt_parsed, entry_createdAt_parsed, 
-                        cleanded_user_startedAt, cleanded_user_completedAt, cleaned_notes, cleaned_description, 
-                        country_parsed, media_startDate_parsed, media_endDate_parsed, genres_json, external_links_json
-                    )
-
-
-                    
-                    
-                    
-                        # using function from different file, I can't do this different
-                    #logger("insert record: ", insert_record) #uncomment to see what is going to be inserted
-                    insert_querry_to_db(insert_query, insert_record, format_parsed)
+                    #logger("insert record: ", manga_record) #uncomment to see what is going to be inserted
+                    add_insert_to_batch(page_rows, manga_record, format_parsed)
+                    existing[mediaId_parsed] = updatedAt_parsed
                     total_added+= 1    
                     
+            # One statement batch and one commit for the whole page
+            cursor.executemany(UPSERT_MANGA_QUERY, page_rows)
+            conn.commit()
+
             logger(f"{YELLOW}Total added: {total_added}{RESET}")
             logger(f"{MAGENTA}Total updated: {total_updated}{RESET}")
-            conn.commit()
             
             i += 1
 
@@ -521,6 +520,8 @@ def start_backup(input_value, db_type, logger):
     except Exception as e:
         logger(f"Error: {e}")
     finally:
+        stop_fetching.set()
+        session.close()
         cursor.close()
         conn.close()
 